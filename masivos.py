@@ -2,9 +2,17 @@
 import os
 import sys
 import argparse
+import re
 import time
-from typing import List, Dict, Optional
-from multiprocessing import Process
+import csv
+import heapq
+import queue
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from multiprocessing import Process, Queue
 
 # -----------------------
 # Path del proyecto
@@ -27,6 +35,23 @@ try:
         masivo_marcar_a_la_firma,
         estacionar_mouse,
         seleccionar_modelo_por_texto,
+        llamar_sheets,
+        estadisticas_sheets,
+        clave_marca,
+        leer_marca,
+        borrar_marca,
+        filtrar_filas_nuevas,
+        contar_editados,
+        registrar_filas_procesadas,
+        preparar_template_chrome,
+        instrumentar_driver,
+        paso_webdriver,
+        comandos_driver,
+        resumen_comandos,
+        DOWNLOAD_DIR,
+        leer_latencias,
+        registrar_latencia,
+        liberar_perfil_chrome,
     )
 except ImportError:
     print("📥 utils_mini no encontrado localmente, descargando desde GitHub...")
@@ -55,6 +80,23 @@ except ImportError:
         masivo_marcar_a_la_firma,
         estacionar_mouse,
         seleccionar_modelo_por_texto,
+        llamar_sheets,
+        estadisticas_sheets,
+        clave_marca,
+        leer_marca,
+        borrar_marca,
+        filtrar_filas_nuevas,
+        contar_editados,
+        registrar_filas_procesadas,
+        preparar_template_chrome,
+        instrumentar_driver,
+        paso_webdriver,
+        comandos_driver,
+        resumen_comandos,
+        DOWNLOAD_DIR,
+        leer_latencias,
+        registrar_latencia,
+        liberar_perfil_chrome,
     )
     print("✅ utils_mini cargado desde GitHub")
 
@@ -75,6 +117,26 @@ SHEET_TAB  = os.getenv("SHEET_TAB",  "masivos")
 FILA_INICIO = int(os.getenv("FILA_INICIO", 3))
 CHROME_DRIVER_PATH = os.getenv("CHROME_DRIVER_PATH")
 KEEP_BROWSER_OPEN = True  # puede override por CLI
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9108))  # 0 = sin endpoint HTTP
+DASHBOARD_INTERVALO = float(os.getenv("DASHBOARD_INTERVALO", 15))  # 0 = sin tablero
+WORKER_STALL_S = float(os.getenv("WORKER_STALL_S", 120))
+CONTAR_COMANDOS = os.getenv("CONTAR_COMANDOS", "0") == "1"  # instrumenta el driver
+VERIFICAR_WORKERS = int(os.getenv("VERIFICAR_WORKERS", 3))
+# Planificación: "E=1,A=3" (1 = máxima prioridad) y "E=13:30" (hora límite de hoy)
+MASIVOS_PRIORIDADES = os.getenv("MASIVOS_PRIORIDADES", "")
+MASIVOS_DEADLINES = os.getenv("MASIVOS_DEADLINES", "")
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", 0))  # 0 = todas las opciones en paralelo
+PRIORIDAD_DEFAULT = 5
+# Estimación si no hay latencia medida para la opción
+SEG_POR_EXP_DEFAULT = 6.0
+OVERHEAD_DEFAULT_S = 45.0
+# URL de consulta de solo lectura con {expediente} (ej: ".../consulta?cod={expediente}").
+# Obligatoria para --verify: debe listar los documentos del expediente.
+VERIFICAR_URL = os.getenv("VERIFICAR_URL")
+# Filas de documentos en esa consulta y columnas (1-indexed) de fecha y modelo
+VERIFICAR_FILAS_CSS = os.getenv("VERIFICAR_FILAS_CSS", "tr")
+VERIFICAR_COL_FECHA = int(os.getenv("VERIFICAR_COL_FECHA", 1))
+VERIFICAR_COL_MODELO = int(os.getenv("VERIFICAR_COL_MODELO", 2))
 
 # input de la pantalla de "Documentos digitales"
 NAME_CODIGOBARRAS = 'despachoDocumentosMasivoDecorate:searchFilters:search1:filterFormVisible:codigoBarras'
@@ -116,8 +178,20 @@ def letra_a_indice(letra: str) -> int:
         idx = idx * 26 + (ord(ch) - ord('A') + 1)
     return idx
 
+_RE_URGENTE = re.compile(r"\(?\burgente\b\)?", re.IGNORECASE)
+
+def separar_urgencia(valor: str) -> Tuple[str, bool]:
+    """Filas urgentes en la hoja: '!123/2020' o '123/2020 (URGENTE)'."""
+    v = (valor or "").strip()
+    urgente = False
+    if v.startswith("!"):
+        v, urgente = v[1:].strip(), True
+    if _RE_URGENTE.search(v):
+        v, urgente = _RE_URGENTE.sub("", v).strip(), True
+    return v, urgente
+
 def normalizar_expediente(expediente: str) -> str:
-    return (expediente or "").replace("/", "").strip()
+    return separar_urgencia(expediente)[0].replace("/", "").strip()
 
 def seleccionar_mejor_opcion(filas) -> bool:
     """Tilda checkbox evitando 'incidente' / 'recurso de queja' y eligiendo el más 'corto'."""
@@ -170,17 +244,221 @@ def xpath_modelo_clickable(texto: str) -> str:
             f'//*[contains(normalize-space(.), "{frag}")]'
             '/ancestor-or-self::*[self::a or self::span or self::div or self::td or self::tr or self::li][1]')
 
+def leer_columna_con_filas(worksheet, letra: str, fila_inicio: int) -> List[Tuple[int, str]]:
+    """Como leer_columna_por_letra, pero devuelve (fila 1-indexed, valor)."""
+    idx = letra_a_indice(letra)
+    vals = llamar_sheets(worksheet.col_values, idx)
+    return [(fila_inicio + i, v) for i, v in enumerate(vals[fila_inicio - 1:]) if (v or "").strip()]
+
 def leer_columna_por_letra(worksheet, letra: str, fila_inicio: int) -> List[str]:
     """Lee valores de Google Sheets desde la columna 'letra', empezando en fila_inicio."""
-    idx = letra_a_indice(letra)
-    vals = worksheet.col_values(idx)
-    return [v for v in vals[fila_inicio - 1:] if (v or "").strip()]
+    return [v for _fila, v in leer_columna_con_filas(worksheet, letra, fila_inicio)]
+
+# =======================
+# EVENTOS DE PROGRESO (worker → padre)
+# =======================
+def emitir_evento(eventos, tipo: str, opcion: str, **datos) -> None:
+    """Envía un evento al proceso padre. Sin cola (ejecución directa) no hace nada."""
+    if eventos is None:
+        return
+    try:
+        eventos.put({"tipo": tipo, "opcion": opcion, "ts": time.time(), **datos})
+    except Exception:
+        pass
+
+@contextmanager
+def medir_paso(eventos, opcion: str, paso: str, driver=None):
+    """
+    Mide la duración de un paso lógico y la reporta como evento 'paso'.
+    Con un driver instrumentado también reporta los comandos WebDriver del paso.
+    """
+    t0 = time.perf_counter()
+    c0 = comandos_driver(driver) if driver is not None else 0
+    try:
+        if driver is not None:
+            with paso_webdriver(driver, paso):
+                yield
+        else:
+            yield
+    finally:
+        datos = {"paso": paso, "duracion": time.perf_counter() - t0}
+        if driver is not None and CONTAR_COMANDOS:
+            datos["comandos"] = comandos_driver(driver) - c0
+        emitir_evento(eventos, "paso", opcion, **datos)
+
+# =======================
+# VERIFICACIÓN POST-CORRIDA (solo lectura)
+# =======================
+def _norm_texto(s: str) -> str:
+    return " ".join((s or "").strip().lower().split())
+
+_RE_FECHA = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})(?:\s+(\d{1,2}):(\d{2}))?")
+
+def _fecha_documento(texto: str) -> Optional[Tuple[datetime, bool]]:
+    """'dd/mm/aaaa [hh:mm]' → (fecha, trae_hora). None si no hay fecha."""
+    m = _RE_FECHA.search(texto or "")
+    if not m:
+        return None
+    d, mes, a, h, mi = m.groups()
+    try:
+        return datetime(int(a), int(mes), int(d), int(h or 0), int(mi or 0)), h is not None
+    except ValueError:
+        return None
+
+def contar_en_consulta(filas: List[List[str]], texto: str, exp_norm: str,
+                       modelo_texto: str, desde: float) -> Optional[int]:
+    """
+    Documentos del modelo (coincidencia exacta en la columna de modelo) con
+    fecha desde el arranque de la corrida. None si la página no es la consulta
+    del expediente (login, error) o si una fila del modelo no tiene fecha legible.
+    """
+    if not re.search(rf"(?<!\d){re.escape(exp_norm)}(?!\d)", (texto or "").replace("/", "")):
+        return None
+    inicio = datetime.fromtimestamp(desde)
+    modelo = _norm_texto(modelo_texto)
+    cantidad = 0
+    for celdas in filas:
+        if len(celdas) < max(VERIFICAR_COL_FECHA, VERIFICAR_COL_MODELO):
+            continue
+        if _norm_texto(celdas[VERIFICAR_COL_MODELO - 1]) != modelo:
+            continue
+        fecha = _fecha_documento(celdas[VERIFICAR_COL_FECHA - 1])
+        if fecha is None:
+            return None
+        cuando, trae_hora = fecha
+        if (cuando >= inicio) if trae_hora else (cuando.date() >= inicio.date()):
+            cantidad += 1
+    return cantidad
+
+def contar_documentos(driver, exp_norm: str, modelo_texto: str, desde: float) -> Optional[int]:
+    """Documentos del modelo generados desde 'desde' en la consulta (VERIFICAR_URL) del expediente."""
+    driver.get(VERIFICAR_URL.format(expediente=exp_norm))
+    WebDriverWait(driver, 10).until(
+        lambda d: d.execute_script("return document.readyState") != "loading"
+    )
+    # Una sola ida y vuelta: texto de la página + celdas de cada fila
+    datos = driver.execute_script(
+        "return {texto: document.body ? document.body.innerText : '',"
+        " filas: Array.from(document.querySelectorAll(arguments[0]))"
+        ".map(tr => Array.from(tr.cells || []).map(td => td.innerText))};",
+        VERIFICAR_FILAS_CSS,
+    ) or {}
+    return contar_en_consulta(datos.get("filas") or [], datos.get("texto") or "",
+                              exp_norm, modelo_texto, desde)
+
+def _verificar_lote(items: List[Tuple[str, str, str]], chromedriver_path: Optional[str],
+                    slot: str, desde: float, resultados) -> None:
+    """Worker de verificación: una sesión propia, solo consultas. items = (opcion, exp, modelo)."""
+    driver = None
+    try:
+        driver, wait, _ = configurar_selenium(chromedriver_path, perfil_slot=slot)
+        iniciar_sesion(driver, wait)
+        for opcion, exp, modelo in items:
+            try:
+                cantidad = contar_documentos(driver, exp, modelo, desde)
+                error = None if cantidad is not None else "la consulta no mostró el expediente"
+                resultados.put((opcion, exp, cantidad, error))
+            except Exception as e:
+                resultados.put((opcion, exp, None, f"{type(e).__name__} - {e}"))
+    except Exception as e:
+        for opcion, exp, _modelo in items:
+            resultados.put((opcion, exp, None, f"sesión: {type(e).__name__} - {e}"))
+    finally:
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            liberar_perfil_chrome(driver)
+
+def verificar_despachados(confirmados: Dict[str, List[str]], *, chromedriver_path: Optional[str],
+                          desde: float, n_workers: int = VERIFICAR_WORKERS) -> Dict:
+    """
+    Verifica, con un único pool de sesiones de solo lectura (hasta n_workers),
+    los expedientes tildados en esta corrida ({opcion_id: [expedientes]}),
+    contando solo documentos generados desde 'desde' (epoch del arranque).
+    faltante = sin documento del modelo; duplicado = más de uno.
+    Escribe un CSV en DOWNLOAD_DIR.
+    """
+    if not VERIFICAR_URL:
+        raise ValueError("La verificación requiere VERIFICAR_URL.")
+
+    modelos = {o["id"]: o["modelo_texto"] for o in OPCIONES}
+    items = [(op, exp, modelos[op]) for op, exps in confirmados.items()
+             for exp in dict.fromkeys(exps)]
+    if not items:
+        return {"faltantes": [], "duplicados": [], "sin_verificar": [], "reporte": None}
+    n = max(1, min(n_workers, len(items)))
+    lotes = [items[k::n] for k in range(n)]
+    print(f"\n🔎 Verificando {len(items)} expedientes tildados con {n} sesión(es)...")
+
+    resultados = Queue()
+    procs = []
+    for k, lote in enumerate(lotes):
+        p = Process(target=_verificar_lote,
+                    args=(lote, chromedriver_path, f"v{k}", desde, resultados))
+        p.daemon = False
+        p.start()
+        procs.append(p)
+
+    vistos: Dict[Tuple[str, str], tuple] = {}
+    while len(vistos) < len(items):
+        try:
+            opcion, exp, cantidad, error = resultados.get(timeout=5)
+            vistos[(opcion, exp)] = (cantidad, error)
+        except queue.Empty:
+            if not any(p.is_alive() for p in procs):
+                break
+    for p in procs:
+        p.join()
+
+    filas, faltantes, duplicados, sin_verificar = [], [], [], []
+    for opcion, exp, _modelo in items:
+        cantidad, error = vistos.get((opcion, exp), (None, "sin respuesta del worker"))
+        if cantidad is None:
+            estado = "sin_verificar"
+            sin_verificar.append((opcion, exp))
+        elif cantidad == 0:
+            estado = "faltante"
+            faltantes.append((opcion, exp))
+        elif cantidad > 1:
+            estado = "duplicado"
+            duplicados.append((opcion, exp))
+        else:
+            estado = "ok"
+        filas.append([opcion, exp, "" if cantidad is None else cantidad, estado, error or ""])
+
+    reporte = DOWNLOAD_DIR / f"verificacion_{time.strftime('%Y%m%d_%H%M%S')}.csv"
+    try:
+        with open(reporte, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["opcion", "expediente", "documentos_modelo", "estado", "error"])
+            w.writerows(filas)
+    except OSError as e:
+        print(f"⚠️ No pude escribir el reporte: {e}")
+        reporte = None
+
+    print(f"🔎 OK={len(items) - len(faltantes) - len(duplicados) - len(sin_verificar)}  "
+          f"faltantes={len(faltantes)}  duplicados={len(duplicados)}  sin verificar={len(sin_verificar)}")
+    for opcion, exp in faltantes:
+        print(f"   ❌ [{opcion}] Falta documento: {exp}")
+    for opcion, exp in duplicados:
+        print(f"   ➕ [{opcion}] Más de un documento del modelo: {exp}")
+    if reporte:
+        print(f"📄 Reporte: {reporte}")
+    return {"faltantes": faltantes, "duplicados": duplicados, "sin_verificar": sin_verificar,
+            "reporte": str(reporte) if reporte else None}
 
 # =======================
 # FLUJO POR OPCIÓN
 # =======================
 def ejecutar_opcion(conf: Dict, *, sheet_name: str, sheet_tab: str, fila_inicio: int,
-                    chromedriver_path: Optional[str], keep_browser_open: bool):
+                    chromedriver_path: Optional[str], keep_browser_open: bool,
+                    eventos=None, incremental: bool = False, perfil_slot=None) -> List[str]:
+    """
+    Procesa una opción completa. Devuelve los expedientes (normalizados)
+    tildados y confirmados, para la verificación posterior.
+    """
     nombre = conf["id"]
     col = conf["col_letra"]
     clave = conf["clave"]
@@ -189,84 +467,143 @@ def ejecutar_opcion(conf: Dict, *, sheet_name: str, sheet_tab: str, fila_inicio:
     print(f"\n>>> [{nombre}] Iniciando…  (Columna {col}, clave='{clave}', modelo='{modelo_txt}')")
 
     # 1) Leer expedientes de Sheets
-    hoja = autenticar_google_sheets(sheet_name, sheet_tab)
-    expedientes = leer_columna_por_letra(hoja, col, fila_inicio)
+    try:
+        with medir_paso(eventos, nombre, "sheets"):
+            hoja = autenticar_google_sheets(sheet_name, sheet_tab)
+            expedientes = leer_columna_con_filas(hoja, col, fila_inicio)
+    except Exception as e:
+        emitir_evento(eventos, "fin", nombre, ok=False, error=f"{type(e).__name__} - {e}",
+                      sheets=estadisticas_sheets())
+        raise
     print(f"    · {len(expedientes)} expedientes en columna {col} (desde fila {fila_inicio})")
+    marca_clave = clave_marca(sheet_name, sheet_tab, col)
+    if incremental:
+        marca = leer_marca(marca_clave)
+        nuevos = filtrar_filas_nuevas(expedientes, marca, normalizar_expediente)
+        editados = contar_editados(nuevos, marca, normalizar_expediente)
+        print(f"    · Incremental: {len(nuevos)} a procesar "
+              f"({len(nuevos) - editados} nuevos, {editados} editados en el lugar), "
+              f"{len(expedientes) - len(nuevos)} omitidos por ya despachados "
+              f"(última fila registrada {marca['ultima_fila']})")
+        expedientes = nuevos
+    # Filas urgentes primero (orden estable para el resto)
+    expedientes.sort(key=lambda fv: not separar_urgencia(fv[1])[1])
+    urgentes = sum(1 for _f, v in expedientes if separar_urgencia(v)[1])
+    if urgentes:
+        print(f"    · {urgentes} expedientes urgentes al frente del lote")
+    emitir_evento(eventos, "inicio", nombre, total=len(expedientes))
+    stats = estadisticas_sheets()
+    if stats["reintentos"] or stats["espera_throttle_s"] >= 1:
+        print(f"    · Sheets: {stats['llamadas']} llamadas, {stats['reintentos']} reintentos, "
+              f"{stats['espera_throttle_s'] + stats['espera_backoff_s']:.1f}s en espera por cuota")
     if not expedientes:
         print("    · No hay expedientes. Fin de esta opción.")
-        return
+        emitir_evento(eventos, "fin", nombre, ok=True, confirmados=[], sheets=estadisticas_sheets())
+        return []
 
     # 2) Selenium
-    driver, wait, _actions = configurar_selenium(chromedriver_path)
     try:
-        iniciar_sesion(driver, wait)
-        input_field = abrir_menu_masivos_documentos_digitales(driver, wait, verificar_input=True)
+        with medir_paso(eventos, nombre, "chrome"):
+            driver, wait, _actions = configurar_selenium(chromedriver_path, perfil_slot=perfil_slot)
+            if CONTAR_COMANDOS:
+                instrumentar_driver(driver)
+    except Exception as e:
+        emitir_evento(eventos, "fin", nombre, ok=False, error=f"{type(e).__name__} - {e}",
+                      sheets=estadisticas_sheets())
+        raise
+    ok_final = False
+    error_final = None
+    t_opcion = time.perf_counter()
+    procesados_ok: Dict[int, str] = {}
+    seg_expedientes = 0.0
+    try:
+        with medir_paso(eventos, nombre, "login_menu", driver):
+            iniciar_sesion(driver, wait)
+            input_field = abrir_menu_masivos_documentos_digitales(driver, wait, verificar_input=True)
         try:
             estacionar_mouse(driver, input_field)
         except Exception:
             pass
 
         # 3) Loteo
-        for exp in expedientes:
+        for fila_sheet, exp in expedientes:
             exp_norm = normalizar_expediente(exp)
             print(f"    - {exp} → {exp_norm}")
-            try:
+            t_exp = time.perf_counter()
+            resultado = "ok"
+            c_exp = comandos_driver(driver)
+            with paso_webdriver(driver, "expediente"):
                 try:
-                    input_field.clear()
-                except (StaleElementReferenceException, ElementNotInteractableException, NoSuchElementException):
-                    input_field = wait.until(EC.element_to_be_clickable((By.NAME, NAME_CODIGOBARRAS)))
-                    try: input_field.click()
-                    except Exception: pass
-                    try: estacionar_mouse(driver, input_field)
-                    except Exception: pass
-                    input_field.clear()
-
-                input_field.send_keys(exp_norm)
-                input_field.send_keys(Keys.ENTER)
-                time.sleep(1.5)  # ← Aumentado ligeramente
-
-                wait.until(EC.presence_of_element_located((By.XPATH, "//tr[contains(@class, 'rich-table-row')]")))
-                filas = driver.find_elements(By.XPATH, "//tr[contains(@class, 'rich-table-row')]")
-
-                if filas:
-                    try: estacionar_mouse(driver, filas[0])
-                    except Exception: pass
-
-                if not filas:
-                    print("      ⚠️ Sin filas para este código.")
-                    continue
-
-                if len(filas) == 1:
                     try:
-                        cb = filas[0].find_element(By.XPATH, ".//input[@type='checkbox']")
-                        if not cb.is_selected():
-                            cb.click()
-                    except Exception:
-                        print("      ⚠️ No se pudo tildar la única fila.")
-                else:
-                    ok = seleccionar_mejor_opcion(filas)
-                    if not ok:
-                        print("      ⚠️ No se pudo elegir opción válida (¿todas eran incidente/queja?).")
-            except Exception as e:
-                print(f"      ❌ Error con {exp}: {type(e).__name__} - {e}")
+                        input_field.clear()
+                    except (StaleElementReferenceException, ElementNotInteractableException, NoSuchElementException):
+                        input_field = wait.until(EC.element_to_be_clickable((By.NAME, NAME_CODIGOBARRAS)))
+                        try: input_field.click()
+                        except Exception: pass
+                        try: estacionar_mouse(driver, input_field)
+                        except Exception: pass
+                        input_field.clear()
+
+                    input_field.send_keys(exp_norm)
+                    input_field.send_keys(Keys.ENTER)
+                    time.sleep(1.5)  # ← Aumentado ligeramente
+
+                    wait.until(EC.presence_of_element_located((By.XPATH, "//tr[contains(@class, 'rich-table-row')]")))
+                    filas = driver.find_elements(By.XPATH, "//tr[contains(@class, 'rich-table-row')]")
+
+                    if filas:
+                        try: estacionar_mouse(driver, filas[0])
+                        except Exception: pass
+
+                    if not filas:
+                        print("      ⚠️ Sin filas para este código.")
+                        resultado = "sin_filas"
+                        continue
+
+                    if len(filas) == 1:
+                        try:
+                            cb = filas[0].find_element(By.XPATH, ".//input[@type='checkbox']")
+                            if not cb.is_selected():
+                                cb.click()
+                        except Exception:
+                            print("      ⚠️ No se pudo tildar la única fila.")
+                            resultado = "no_tildado"
+                    else:
+                        ok = seleccionar_mejor_opcion(filas)
+                        if not ok:
+                            print("      ⚠️ No se pudo elegir opción válida (¿todas eran incidente/queja?).")
+                            resultado = "no_tildado"
+                except Exception as e:
+                    print(f"      ❌ Error con {exp}: {type(e).__name__} - {e}")
+                    resultado = "error"
+                finally:
+                    emitir_evento(eventos, "expediente", nombre, expediente=exp_norm,
+                                  resultado=resultado, duracion=time.perf_counter() - t_exp,
+                                  comandos=comandos_driver(driver) - c_exp)
+                    seg_expedientes += time.perf_counter() - t_exp
+                    if resultado == "ok":
+                        procesados_ok[fila_sheet] = exp_norm
 
         # 4) Confirmaciones + Modelo + Firma + Estado
-        confirmar_seleccion(driver, wait)
-        masivo_confirmar_seleccion_final(driver, wait)
+        with medir_paso(eventos, nombre, "confirmaciones", driver):
+            confirmar_seleccion(driver, wait)
+            masivo_confirmar_seleccion_final(driver, wait)
         try: estacionar_mouse(driver)
         except Exception: pass
 
-        seleccionar_modelo_por_texto(
-            driver, wait,
-            clave=clave,
-            texto_objetivo=modelo_txt,
-            frag_fallback=modelo_txt
-        )
+        with medir_paso(eventos, nombre, "modelo", driver):
+            seleccionar_modelo_por_texto(
+                driver, wait,
+                clave=clave,
+                texto_objetivo=modelo_txt,
+                frag_fallback=modelo_txt
+            )
 
         try: estacionar_mouse(driver)
         except Exception: pass
 
-        masivo_marcar_a_la_firma(driver, wait, marcar=True)
+        with medir_paso(eventos, nombre, "firma", driver):
+            masivo_marcar_a_la_firma(driver, wait, marcar=True)
 
         try:
             from utils_mini import seleccionar_estado_proyecto
@@ -275,12 +612,331 @@ def ejecutar_opcion(conf: Dict, *, sheet_name: str, sheet_tab: str, fila_inicio:
             pass
 
         print(f"    ✅ [{nombre}] Finalizado OK.")
+        if CONTAR_COMANDOS:
+            print(f"    · Comandos WebDriver [{nombre}]:")
+            for linea in resumen_comandos(driver).splitlines():
+                print(f"      {linea}")
+        ok_final = True
+        try:
+            registrar_filas_procesadas(marca_clave, procesados_ok)
+        except Exception as e:
+            print(f"    ⚠️ No pude actualizar la marca incremental: {type(e).__name__} - {e}")
+        try:
+            registrar_latencia(nombre, seg_expedientes / len(expedientes),
+                               time.perf_counter() - t_opcion - seg_expedientes)
+        except Exception:
+            pass
+    except Exception as e:
+        error_final = f"{type(e).__name__} - {e}"
+        raise
     finally:
+        emitir_evento(eventos, "fin", nombre, ok=ok_final, error=error_final, sheets=estadisticas_sheets(),
+                      confirmados=list(procesados_ok.values()) if ok_final else [])
         if not keep_browser_open:
             try:
                 driver.quit()
             except Exception:
                 pass
+            liberar_perfil_chrome(driver)
+
+    return list(procesados_ok.values())
+
+# =======================
+# PLANIFICACIÓN (prioridades + deadlines)
+# =======================
+def _indice_opcion(tok: str) -> Optional[int]:
+    """'E' (letra de columna) o '3' (número de opción, 1-based) → índice 0-based."""
+    tok = tok.strip().upper()
+    if tok.isdigit():
+        j = int(tok) - 1
+        return j if 0 <= j < len(OPCIONES) else None
+    for j, o in enumerate(OPCIONES):
+        if o["col_letra"].upper() == tok:
+            return j
+    return None
+
+def parse_mapa_opciones(texto: str) -> Dict[int, str]:
+    """
+    Convierte "E=1,A=3" → {2: "1", 0: "3"}. Ignora tokens inválidos.
+    """
+    out: Dict[int, str] = {}
+    for tok in (texto or "").replace(" ", "").split(","):
+        if "=" not in tok:
+            continue
+        k, v = tok.split("=", 1)
+        j = _indice_opcion(k)
+        if j is not None and v:
+            out[j] = v
+    return out
+
+def parse_deadline(hhmm: str) -> Optional[float]:
+    """'13:30' → epoch de hoy a esa hora (None si es inválido)."""
+    try:
+        h, m = (int(x) for x in hhmm.split(":", 1))
+        t = time.localtime()
+        return time.mktime((t.tm_year, t.tm_mon, t.tm_mday, h, m, 0, 0, 0, -1))
+    except (ValueError, OverflowError):
+        print(f"⚠️ Deadline inválido: {hhmm!r} (usar HH:MM)")
+        return None
+
+def contar_expedientes(idxs: List[int], *, sheet_name: str, sheet_tab: str, fila_inicio: int,
+                       incremental: bool) -> Dict[int, int]:
+    """Cantidad de expedientes por opción, para estimar duraciones."""
+    hoja = autenticar_google_sheets(sheet_name, sheet_tab)
+    conteos = {}
+    for i in idxs:
+        col = OPCIONES[i]["col_letra"]
+        filas = leer_columna_con_filas(hoja, col, fila_inicio)
+        if incremental:
+            filas = filtrar_filas_nuevas(filas, leer_marca(clave_marca(sheet_name, sheet_tab, col)),
+                                         normalizar_expediente)
+        conteos[i] = len(filas)
+    return conteos
+
+def planificar_opciones(idxs: List[int], *, prioridades: Dict[int, int], deadlines: Dict[int, float],
+                        conteos: Dict[int, int], capacidad: int) -> List[Dict]:
+    """
+    Ordena por deadline más próximo, luego prioridad y luego orden de --ops.
+    Simula el reparto sobre 'capacidad' workers con la latencia medida y
+    devuelve [{"idx", "inicio", "fin", "deadline"}] en orden de arranque.
+    """
+    inf = float("inf")
+    orden = sorted(idxs, key=lambda i: (deadlines.get(i, inf),
+                                         prioridades.get(i, PRIORIDAD_DEFAULT),
+                                         idxs.index(i)))
+    latencias = leer_latencias()
+    ahora = time.time()
+    libres = [ahora] * max(1, capacidad)
+    heapq.heapify(libres)
+    plan = []
+    for i in orden:
+        lat = latencias.get(OPCIONES[i]["id"], {})
+        dur = (float(lat.get("overhead_s", OVERHEAD_DEFAULT_S))
+               + conteos.get(i, 0) * float(lat.get("seg_por_exp", SEG_POR_EXP_DEFAULT)))
+        inicio = heapq.heappop(libres)
+        fin = inicio + dur
+        heapq.heappush(libres, fin)
+        plan.append({"idx": i, "inicio": inicio, "fin": fin, "duracion": dur,
+                     "deadline": deadlines.get(i)})
+    return plan
+
+def avisar_plan(plan: List[Dict], capacidad: int) -> None:
+    """Imprime el plan y avisa qué deadlines no se llegan a cumplir."""
+    print(f"\n🗓️ Plan ({capacidad} worker(s)):")
+    ahora = time.time()
+    for p in plan:
+        o = OPCIONES[p["idx"]]
+        hora_fin = time.strftime("%H:%M", time.localtime(p["fin"]))
+        linea = f"   {o['id']:<28} ETA {hora_fin} (~{p['duracion'] / 60:.0f}min)"
+        dl = p["deadline"]
+        if dl is not None:
+            linea += f"  deadline {time.strftime('%H:%M', time.localtime(dl))}"
+            if p["fin"] > dl:
+                if ahora + p["duracion"] > dl:
+                    linea += "  ⚠️ NO LLEGA ni con un worker dedicado"
+                else:
+                    linea += "  ⚠️ NO LLEGA con la concurrencia actual (subir --max-workers)"
+        print(linea)
+
+# =======================
+# MÉTRICAS EN VIVO (proceso padre)
+# =======================
+def nuevo_estado_metricas(opciones: List[str], deadlines: Optional[Dict[str, float]] = None) -> Dict:
+    """Estado agregado por opción, alimentado por los eventos de los workers."""
+    ahora = time.time()
+    deadlines = deadlines or {}
+    return {
+        "lock": threading.Lock(),
+        "inicio": ahora,
+        "opciones": {
+            o: {
+                "total": None,
+                "resultados": {},
+                "pasos": {},
+                "comandos": {},
+                "t_inicio": None,
+                "ultimo_evento": ahora,
+                "estado": "en_cola",
+                "error": None,
+                "deadline": deadlines.get(o),
+                "confirmados": [],
+                "sheets": {},
+            } for o in opciones
+        },
+    }
+
+def aplicar_evento(estado: Dict, ev: Dict) -> None:
+    with estado["lock"]:
+        op = estado["opciones"].get(ev.get("opcion"))
+        if op is None:
+            return
+        op["ultimo_evento"] = ev.get("ts", time.time())
+        tipo = ev.get("tipo")
+        if tipo == "lanzado":
+            if op["estado"] == "en_cola":
+                op["estado"] = "arrancando"
+        elif tipo == "inicio":
+            op["total"] = ev.get("total", 0)
+            op["t_inicio"] = op["ultimo_evento"]
+            op["estado"] = "procesando"
+        elif tipo == "expediente":
+            res = ev.get("resultado", "ok")
+            op["resultados"][res] = op["resultados"].get(res, 0) + 1
+            suma, n = op["pasos"].get("expediente", (0.0, 0))
+            op["pasos"]["expediente"] = (suma + ev.get("duracion", 0.0), n + 1)
+            if ev.get("comandos"):
+                op["comandos"]["expediente"] = op["comandos"].get("expediente", 0) + ev["comandos"]
+        elif tipo == "paso":
+            suma, n = op["pasos"].get(ev["paso"], (0.0, 0))
+            op["pasos"][ev["paso"]] = (suma + ev.get("duracion", 0.0), n + 1)
+            if ev.get("comandos"):
+                op["comandos"][ev["paso"]] = op["comandos"].get(ev["paso"], 0) + ev["comandos"]
+        elif tipo == "fin":
+            op["estado"] = "ok" if ev.get("ok") else "error"
+            op["error"] = ev.get("error")
+            op["confirmados"] = list(ev.get("confirmados") or [])
+            op["sheets"] = dict(ev.get("sheets") or {})
+
+def consumir_eventos(cola, estado: Dict) -> None:
+    """Hilo del padre: vacía la cola hasta recibir el centinela None."""
+    while True:
+        try:
+            ev = cola.get()
+        except (EOFError, OSError):
+            return
+        if ev is None:
+            return
+        aplicar_evento(estado, ev)
+
+def _resumen_opcion(op: Dict, ahora: float) -> Dict:
+    procesados = sum(op["resultados"].values())
+    total = op["total"]
+    tasa = 0.0
+    if op["t_inicio"] and procesados:
+        tasa = procesados / max(1e-6, ahora - op["t_inicio"]) * 60.0
+    eta = None
+    if total is not None and tasa > 0:
+        eta = max(0, total - procesados) / tasa * 60.0
+    return {"procesados": procesados, "tasa_min": tasa, "eta_s": eta,
+            "inactivo_s": ahora - op["ultimo_evento"]}
+
+def _label(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def render_metricas_prometheus(estado: Dict) -> str:
+    """Exposición en formato de texto de Prometheus."""
+    ahora = time.time()
+    lineas = [
+        "# HELP masivos_expedientes_total Expedientes procesados por opción y resultado.",
+        "# TYPE masivos_expedientes_total counter",
+    ]
+    with estado["lock"]:
+        opciones = {k: dict(v, resultados=dict(v["resultados"]), pasos=dict(v["pasos"]),
+                            comandos=dict(v["comandos"]), sheets=dict(v["sheets"]))
+                    for k, v in estado["opciones"].items()}
+    for nombre, op in opciones.items():
+        for res, n in sorted(op["resultados"].items()):
+            lineas.append(f'masivos_expedientes_total{{opcion="{_label(nombre)}",resultado="{res}"}} {n}')
+
+    lineas += ["# HELP masivos_expedientes_pendientes Expedientes que faltan procesar.",
+               "# TYPE masivos_expedientes_pendientes gauge"]
+    for nombre, op in opciones.items():
+        if op["total"] is not None:
+            pend = max(0, op["total"] - sum(op["resultados"].values()))
+            lineas.append(f'masivos_expedientes_pendientes{{opcion="{_label(nombre)}"}} {pend}')
+
+    lineas += ["# HELP masivos_expedientes_por_minuto Tasa media desde el inicio de la opción.",
+               "# TYPE masivos_expedientes_por_minuto gauge"]
+    for nombre, op in opciones.items():
+        r = _resumen_opcion(op, ahora)
+        lineas.append(f'masivos_expedientes_por_minuto{{opcion="{_label(nombre)}"}} {r["tasa_min"]:.3f}')
+
+    lineas += ["# HELP masivos_paso_segundos Duración de cada paso lógico.",
+               "# TYPE masivos_paso_segundos summary"]
+    for nombre, op in opciones.items():
+        for paso, (suma, n) in sorted(op["pasos"].items()):
+            lbl = f'opcion="{_label(nombre)}",paso="{_label(paso)}"'
+            lineas.append(f"masivos_paso_segundos_sum{{{lbl}}} {suma:.3f}")
+            lineas.append(f"masivos_paso_segundos_count{{{lbl}}} {n}")
+
+    lineas += ["# HELP masivos_paso_comandos_total Comandos WebDriver por paso (CONTAR_COMANDOS=1).",
+               "# TYPE masivos_paso_comandos_total counter"]
+    for nombre, op in opciones.items():
+        for paso, n in sorted(op["comandos"].items()):
+            lineas.append(f'masivos_paso_comandos_total{{opcion="{_label(nombre)}",paso="{_label(paso)}"}} {n}')
+
+    metricas_sheets = [
+        ("llamadas", "masivos_sheets_llamadas", "Llamadas a la API de Sheets del worker."),
+        ("reintentos", "masivos_sheets_reintentos", "Reintentos por 429/5xx del worker."),
+        ("espera_throttle_s", "masivos_sheets_espera_throttle_segundos", "Segundos esperando cuota (token bucket)."),
+        ("espera_backoff_s", "masivos_sheets_espera_backoff_segundos", "Segundos en backoff por 429/5xx."),
+    ]
+    for clave, metrica, ayuda in metricas_sheets:
+        lineas += [f"# HELP {metrica} {ayuda}", f"# TYPE {metrica} gauge"]
+        for nombre, op in opciones.items():
+            if clave in op["sheets"]:
+                lineas.append(f'{metrica}{{opcion="{_label(nombre)}"}} {op["sheets"][clave]:g}')
+
+    lineas += ["# HELP masivos_ultimo_evento_timestamp_seconds Último evento recibido del worker.",
+               "# TYPE masivos_ultimo_evento_timestamp_seconds gauge"]
+    for nombre, op in opciones.items():
+        lineas.append(f'masivos_ultimo_evento_timestamp_seconds{{opcion="{_label(nombre)}"}} {op["ultimo_evento"]:.3f}')
+
+    lineas += ["# HELP masivos_worker_estado Estado del worker (1 en la etiqueta activa).",
+               "# TYPE masivos_worker_estado gauge"]
+    for nombre, op in opciones.items():
+        lineas.append(f'masivos_worker_estado{{opcion="{_label(nombre)}",estado="{op["estado"]}"}} 1')
+    return "\n".join(lineas) + "\n"
+
+def iniciar_servidor_metricas(estado: Dict, port: int):
+    """Levanta /metrics en 127.0.0.1:port en un hilo daemon. Devuelve el server (o None)."""
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = render_metricas_prometheus(estado).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    except OSError as e:
+        print(f"⚠️ No pude abrir el endpoint de métricas en :{port} ({e}). Sigo sin él.")
+        return None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"📈 Métricas en http://127.0.0.1:{port}/metrics")
+    return server
+
+def imprimir_tablero(estado: Dict) -> None:
+    """Tablero compacto de una línea por opción."""
+    ahora = time.time()
+    with estado["lock"]:
+        opciones = {k: dict(v, resultados=dict(v["resultados"])) for k, v in estado["opciones"].items()}
+    print(f"\n📊 Progreso ({ahora - estado['inicio']:.0f}s)")
+    for nombre, op in opciones.items():
+        r = _resumen_opcion(op, ahora)
+        total = "?" if op["total"] is None else op["total"]
+        errores = op["resultados"].get("error", 0)
+        eta = "--" if r["eta_s"] is None else f"{r['eta_s'] / 60:.1f}min"
+        linea = (f"   {nombre:<28} {op['estado']:<10} {r['procesados']}/{total}  "
+                 f"err={errores}  {r['tasa_min']:.1f}/min  ETA {eta}")
+        if op["deadline"] and r["eta_s"] is not None and op["estado"] == "procesando" \
+                and ahora + r["eta_s"] > op["deadline"]:
+            linea += f"  ⚠️ no llega a las {time.strftime('%H:%M', time.localtime(op['deadline']))}"
+        if op["estado"] in ("arrancando", "procesando") and r["inactivo_s"] > WORKER_STALL_S:
+            linea += f"  ⚠️ sin actividad hace {r['inactivo_s']:.0f}s"
+        print(linea)
+
+def _bucle_tablero(estado: Dict, intervalo: float, fin: threading.Event) -> None:
+    while not fin.wait(intervalo):
+        imprimir_tablero(estado)
 
 # =======================
 # INPUT / PARSER
@@ -325,13 +981,26 @@ def ejecutar_agente_masivos(
     fila_inicio: int = FILA_INICIO,
     chromedriver_path: Optional[str] = CHROME_DRIVER_PATH,
     keep_browser_open: bool = KEEP_BROWSER_OPEN,
+    metrics_port: int = METRICS_PORT,
+    dashboard_intervalo: float = DASHBOARD_INTERVALO,
+    incremental: bool = False,
+    reset_incremental: bool = False,
+    verificar: bool = False,
+    prioridades: str = MASIVOS_PRIORIDADES,
+    deadlines: str = MASIVOS_DEADLINES,
+    max_workers: int = MAX_WORKERS,
 ):
     """
     Ejecuta el agente de Masivos. Si ops_indices es None, pregunta por consola.
     Si ops_indices tiene 1 elemento → ejecución directa.
-    Si tiene >1 → arranca un proceso por opción (en paralelo).
+    Si tiene >1 → arranca un proceso por opción (hasta max_workers a la vez,
+    en el orden del planificador); los workers reportan eventos por una Queue
+    y el padre expone /metrics + tablero.
     """
     print(">>> Iniciando agente_masivos (multi-opción).")
+    inicio_corrida = time.time()
+    if verificar and not VERIFICAR_URL:
+        raise ValueError("--verify requiere VERIFICAR_URL (consulta que liste los documentos del expediente).")
 
     if ops_indices is None:
         idxs = pedir_opciones_interactivo()
@@ -342,21 +1011,76 @@ def ejecutar_agente_masivos(
         print("No seleccionaste opciones. Fin.")
         return
 
+    if reset_incremental:
+        for i in idxs:
+            col = OPCIONES[i]["col_letra"]
+            if borrar_marca(clave_marca(sheet_name, sheet_tab, col)):
+                print(f"🧹 Marca incremental borrada: {sheet_name}/{sheet_tab} columna {col}")
+
+    # Planificación: prioridad/deadline por opción
+    prios: Dict[int, int] = {}
+    for j, v in parse_mapa_opciones(prioridades).items():
+        if v.isdigit():
+            prios[j] = int(v)
+    dls: Dict[int, float] = {}
+    for j, v in parse_mapa_opciones(deadlines).items():
+        dl = parse_deadline(v)
+        if dl is not None:
+            dls[j] = dl
+    capacidad = max_workers if max_workers and max_workers > 0 else len(idxs)
+    conteos: Dict[int, int] = {}
+    if dls:
+        try:
+            conteos = contar_expedientes(idxs, sheet_name=sheet_name, sheet_tab=sheet_tab,
+                                         fila_inicio=fila_inicio, incremental=incremental)
+        except Exception as e:
+            print(f"⚠️ No pude contar expedientes para estimar ({type(e).__name__} - {e}).")
+    plan = planificar_opciones(idxs, prioridades=prios, deadlines=dls, conteos=conteos,
+                               capacidad=capacidad)
+    if prios or dls:
+        avisar_plan(plan, capacidad)
+    idxs = [p["idx"] for p in plan]
+
+    # Template de Chrome con caché caliente (una vez, antes de los workers)
+    preparar_template_chrome(chromedriver_path)
+
     if len(idxs) == 1:
-        ejecutar_opcion(
+        confirmados = ejecutar_opcion(
             OPCIONES[idxs[0]],
             sheet_name=sheet_name,
             sheet_tab=sheet_tab,
             fila_inicio=fila_inicio,
             chromedriver_path=chromedriver_path,
             keep_browser_open=keep_browser_open,
+            incremental=incremental,
+            perfil_slot=0,
         )
+        if verificar:
+            verificar_despachados({OPCIONES[idxs[0]]["id"]: confirmados},
+                                  chromedriver_path=chromedriver_path, desde=inicio_corrida)
         print("\n✅ Listo.")
         return
 
     # >1 opción → ejecutar en paralelo (un Chrome por opción)
+    eventos = Queue()
+    estado = nuevo_estado_metricas([OPCIONES[i]["id"] for i in idxs],
+                                   {OPCIONES[i]["id"]: dl for i, dl in dls.items()})
+    consumidor = threading.Thread(target=consumir_eventos, args=(eventos, estado), daemon=True)
+    consumidor.start()
+    server = iniciar_servidor_metricas(estado, metrics_port) if metrics_port else None
+    fin_tablero = threading.Event()
+    if dashboard_intervalo and dashboard_intervalo > 0:
+        threading.Thread(target=_bucle_tablero, args=(estado, dashboard_intervalo, fin_tablero),
+                         daemon=True).start()
+
     procs = []
-    for i in idxs:
+    activos = []
+    for slot, i in enumerate(idxs):
+        # Respetar la capacidad: esperar a que se libere un worker
+        while len(activos) >= capacidad:
+            activos = [p for p in activos if p.is_alive()]
+            if len(activos) >= capacidad:
+                time.sleep(0.5)
         p = Process(
             target=ejecutar_opcion,
             args=(OPCIONES[i],),
@@ -366,16 +1090,46 @@ def ejecutar_agente_masivos(
                 fila_inicio=fila_inicio,
                 chromedriver_path=chromedriver_path,
                 keep_browser_open=keep_browser_open,
+                eventos=eventos,
+                incremental=incremental,
+                perfil_slot=slot,
             ),
         )
         p.daemon = False
         p.start()
+        aplicar_evento(estado, {"tipo": "lanzado", "opcion": OPCIONES[i]["id"], "ts": time.time()})
         procs.append(p)
+        activos.append(p)
         time.sleep(0.5)  # ← Aumentado el desfase de arranque
 
     for p in procs:
         p.join()
 
+    # Vaciar la cola antes de mirar estados: los 'fin' reales llegan por ahí
+    eventos.put(None)
+    consumidor.join(timeout=5)
+
+    # Marcar como caídos solo los workers que murieron sin enviar 'fin'
+    for i, p in zip(idxs, procs):
+        nombre = OPCIONES[i]["id"]
+        with estado["lock"]:
+            terminado = estado["opciones"][nombre]["estado"] in ("ok", "error")
+        if not terminado:
+            aplicar_evento(estado, {"tipo": "fin", "opcion": nombre, "ok": False,
+                                    "error": f"sin evento 'fin' (exitcode={p.exitcode})",
+                                    "ts": time.time()})
+    fin_tablero.set()
+    imprimir_tablero(estado)
+    if server is not None:
+        server.shutdown()
+
+    # Verificación única en el padre, con un solo pool para todas las opciones
+    if verificar:
+        with estado["lock"]:
+            confirmados = {k: list(v["confirmados"]) for k, v in estado["opciones"].items()}
+        verificar_despachados(confirmados, chromedriver_path=chromedriver_path,
+                              desde=inicio_corrida)
+
     print("\n✅ Todas las opciones seleccionadas finalizaron.")
 
 def build_arg_parser() -> argparse.ArgumentParser:
@@ -388,6 +1142,22 @@ def build_arg_parser() -> argparse.ArgumentParser:
     p.add_argument("--start-row", type=int, default=FILA_INICIO,
                    help="Fila de inicio (1-indexed). Default toma de FILA_INICIO.")
     p.add_argument("--chromedriver", type=str, default=CHROME_DRIVER_PATH)
+    p.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                   help="Puerto local para /metrics (Prometheus) con >1 opción. 0 = desactivado.")
+    p.add_argument("--dashboard-interval", type=float, default=DASHBOARD_INTERVALO,
+                   help="Segundos entre refrescos del tablero de consola. 0 = desactivado.")
+    p.add_argument("--incremental", action="store_true",
+                   help="Procesar solo filas nuevas o editadas desde la última corrida OK.")
+    p.add_argument("--reset-incremental", action="store_true",
+                   help="Borrar la marca incremental de las opciones elegidas antes de correr.")
+    p.add_argument("--verify", action="store_true",
+                   help="Al terminar, verificar en solo lectura (VERIFICAR_URL) que existan los documentos.")
+    p.add_argument("--priority", type=str, default=MASIVOS_PRIORIDADES,
+                   help='Prioridad por opción, 1 = máxima (ej: "E=1,A=3"; letra de columna o número).')
+    p.add_argument("--deadline", type=str, default=MASIVOS_DEADLINES,
+                   help='Hora límite de hoy por opción (ej: "E=13:30").')
+    p.add_argument("--max-workers", type=int, default=MAX_WORKERS,
+                   help="Máximo de opciones en paralelo. 0 = todas.")
     grp = p.add_mutually_exclusive_group()
     grp.add_argument("--keep-browser-open", action="store_true", help="Dejar Chrome abierto al final.")
     grp.add_argument("--close-browser", action="store_true", help="Cerrar Chrome al final.")
@@ -397,6 +1167,9 @@ if __name__ == "__main__":
     # Nota: En Windows, multiprocessing usa 'spawn', por eso mantenemos el guard.
     parser = build_arg_parser()
     args = parser.parse_args()
+    if args.verify and not VERIFICAR_URL:
+        parser.error("--verify requiere la variable de entorno VERIFICAR_URL "
+                     "(consulta de solo lectura con {expediente}).")
 
     # Resolver keep_browser_open
     keep_open = KEEP_BROWSER_OPEN
@@ -415,4 +1188,12 @@ if __name__ == "__main__":
         fila_inicio=args.start_row,
         chromedriver_path=args.chromedriver,
         keep_browser_open=keep_open,
+        metrics_port=args.metrics_port,
+        dashboard_intervalo=args.dashboard_interval,
+        incremental=args.incremental,
+        reset_incremental=args.reset_incremental,
+        verificar=args.verify,
+        prioridades=args.priority,
+        deadlines=args.deadline,
+        max_workers=args.max_workers,
     )
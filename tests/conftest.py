@@ -0,0 +1,15 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+
+@pytest.fixture(autouse=True)
+def sin_sleep(monkeypatch):
+    """Las esperas fijas no cuentan para el presupuesto de comandos."""
+    monkeypatch.setattr(time, "sleep", lambda _s: None)
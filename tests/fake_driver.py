@@ -0,0 +1,223 @@
+# fake_driver.py
+# Driver falso en memoria: sirve los comandos WebDriver desde fixtures HTML
+# para contar round-trips sin Chrome ni Lex100.
+
+import re
+from collections import Counter
+from html.parser import HTMLParser
+from pathlib import Path
+
+from selenium.common.exceptions import (
+    InvalidSelectorException, NoSuchElementException, WebDriverException
+)
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.locator_converter import LocatorConverter
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+_VOID = {"input", "br", "img", "meta", "link", "hr"}
+
+# ============== DOM MÍNIMO ==============
+
+class Nodo:
+    def __init__(self, tag, attrs, padre=None):
+        self.tag = tag
+        self.attrs = dict(attrs)
+        self.padre = padre
+        self.hijos = []      # Nodo o str, en orden
+        self.checked = "checked" in self.attrs
+        self.value = self.attrs.get("value", "")
+
+    def elementos(self):
+        return [h for h in self.hijos if isinstance(h, Nodo)]
+
+    def descendientes(self):
+        for h in self.elementos():
+            yield h
+            yield from h.descendientes()
+
+    def texto(self) -> str:
+        partes = []
+        for h in self.hijos:
+            partes.append(h if isinstance(h, str) else h.texto())
+        return " ".join(" ".join(partes).split())
+
+    def visible(self) -> bool:
+        n = self
+        while n is not None:
+            estilo = n.attrs.get("style", "").replace(" ", "").lower()
+            if "display:none" in estilo or "hidden" in n.attrs:
+                return False
+            n = n.padre
+        return True
+
+class _Parser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.raiz = Nodo("#document", {})
+        self.actual = self.raiz
+
+    def handle_starttag(self, tag, attrs):
+        nodo = Nodo(tag, [(k, v if v is not None else "") for k, v in attrs], self.actual)
+        self.actual.hijos.append(nodo)
+        if tag not in _VOID:
+            self.actual = nodo
+
+    def handle_endtag(self, tag):
+        n = self.actual
+        while n is not None and n.tag != tag:
+            n = n.padre
+        if n is not None and n.padre is not None:
+            self.actual = n.padre
+
+    def handle_data(self, data):
+        if data.strip():
+            self.actual.hijos.append(data)
+
+def parsear_html(html: str) -> Nodo:
+    p = _Parser()
+    p.feed(html)
+    return p.raiz
+
+# ============== LOCALIZADORES ==============
+# Solo el subconjunto que usan masivos.py / utils_mini.py.
+
+_RE_XPATH = re.compile(r"^(?P<rel>\.)?//(?P<tag>[\w*]+)(?:\[(?P<pred>.+)\])?$")
+_RE_ATTR_EQ = re.compile(r"""^@([\w-]+)\s*=\s*['"]([^'"]*)['"]$""")
+_RE_CONTAINS = re.compile(r"""^contains\(@([\w-]+),\s*['"]([^'"]*)['"]\)$""")
+_RE_CSS_ATTR = re.compile(r'^\[([\w-]+)="([^"]*)"\]$')
+_RE_CSS_HIJO = re.compile(r'^#((?:\\.|[\w-])+)\s*>\s*(\w+)\[([\w-]+)="([^"]*)"\]$')
+
+def _cumple(n: Nodo, pred: str) -> bool:
+    if pred.isdigit():
+        hermanos = [h for h in n.padre.elementos() if h.tag == n.tag]
+        return hermanos.index(n) + 1 == int(pred)
+    m = _RE_ATTR_EQ.match(pred)
+    if m:
+        return n.attrs.get(m.group(1)) == m.group(2)
+    m = _RE_CONTAINS.match(pred)
+    if m:
+        return m.group(2) in n.attrs.get(m.group(1), "")
+    raise InvalidSelectorException(f"Predicado XPath no soportado por el fake: {pred}")
+
+def buscar(raiz: Nodo, contexto: Nodo, using: str, value: str):
+    if using == "xpath":
+        m = _RE_XPATH.match(value)
+        if not m:
+            raise InvalidSelectorException(f"XPath no soportado por el fake: {value}")
+        base = contexto if m.group("rel") else raiz
+        tag, pred = m.group("tag"), m.group("pred")
+        return [n for n in base.descendientes()
+                if (tag == "*" or n.tag == tag) and (pred is None or _cumple(n, pred))]
+    if using == "css selector":
+        m = _RE_CSS_ATTR.match(value)
+        if m:
+            return [n for n in contexto.descendientes() if n.attrs.get(m.group(1)) == m.group(2)]
+        m = _RE_CSS_HIJO.match(value)
+        if m:
+            id_ = m.group(1).replace("\\", "")
+            return [h for n in contexto.descendientes() if n.attrs.get("id") == id_
+                    for h in n.elementos()
+                    if h.tag == m.group(2) and h.attrs.get(m.group(3)) == m.group(4)]
+    raise InvalidSelectorException(f"Localizador no soportado por el fake: {using}={value}")
+
+# ============== DRIVER ==============
+
+class FakeDriver(WebDriver):
+    """
+    WebDriver que responde desde un HTML en memoria. Los WebElement son los
+    reales de Selenium, así que cada .text / is_displayed() / click() pasa por
+    execute() y queda contado en self.comandos.
+    """
+
+    def __init__(self, html: str):
+        # No se llama a WebDriver.__init__: no hay sesión ni chromedriver.
+        # Los atributos privados de abajo son los que lee Selenium 4.51 (la versión
+        # soportada); si se actualiza Selenium, revisar WebDriver.__init__.
+        self.locator_converter = LocatorConverter()
+        self.session_id = "fake"
+        self._is_remote = False
+        self.pinned_scripts = {}
+        self.raiz = parsear_html(html)
+        self.comandos = Counter()
+        self.ultimo_script_objetivo = None   # Nodo del último executeScript genérico
+        self._por_id = {}
+        self._ids = {}
+
+    @classmethod
+    def desde_fixture(cls, nombre: str) -> "FakeDriver":
+        return cls((FIXTURES_DIR / nombre).read_text(encoding="utf-8"))
+
+    def __repr__(self):
+        return "<FakeDriver>"
+
+    def _elemento(self, nodo: Nodo) -> WebElement:
+        if id(nodo) not in self._ids:
+            eid = f"el-{len(self._ids) + 1}"
+            self._ids[id(nodo)] = eid
+            self._por_id[eid] = nodo
+        return WebElement(self, self._ids[id(nodo)])
+
+    def _nodo(self, params) -> Nodo:
+        return self._por_id[params["id"]]
+
+    def _click(self, nodo: Nodo):
+        if nodo.tag == "input" and nodo.attrs.get("type") == "checkbox":
+            nodo.checked = not nodo.checked
+
+    def _script(self, script: str, args):
+        nodos = [self._por_id[a.id] for a in args if isinstance(a, WebElement)]
+        if script.startswith("/* isDisplayed */"):
+            self.comandos["isElementDisplayed"] += 1
+            return nodos[0].visible()
+        if script.startswith("/* getAttribute */"):
+            self.comandos["getElementAttribute"] += 1
+            nombre = args[1]
+            return nodos[0].value if nombre == "value" else nodos[0].attrs.get(nombre)
+        if "arguments[0].click()" in script:
+            self.comandos["elementClick"] += 1
+            self._click(nodos[0])
+            return None
+        self.comandos["executeScript"] += 1
+        if nodos:
+            self.ultimo_script_objetivo = nodos[0]
+        return None
+
+    def execute(self, driver_command, params=None):
+        params = params or {}
+        if driver_command == Command.W3C_EXECUTE_SCRIPT:
+            return {"value": self._script(params["script"], params.get("args", []))}
+
+        nombre = {Command.CLICK_ELEMENT: "elementClick"}.get(driver_command, driver_command)
+        self.comandos[nombre] += 1
+
+        if driver_command in (Command.FIND_ELEMENT, Command.FIND_ELEMENTS,
+                              Command.FIND_CHILD_ELEMENT, Command.FIND_CHILD_ELEMENTS):
+            contexto = self._nodo(params) if "id" in params else self.raiz
+            nodos = buscar(self.raiz, contexto, params["using"], params["value"])
+            if driver_command in (Command.FIND_ELEMENTS, Command.FIND_CHILD_ELEMENTS):
+                return {"value": [self._elemento(n) for n in nodos]}
+            if not nodos:
+                raise NoSuchElementException(f"{params['using']}={params['value']}")
+            return {"value": self._elemento(nodos[0])}
+        if driver_command == Command.GET_ELEMENT_TEXT:
+            nodo = self._nodo(params)
+            return {"value": nodo.texto() if nodo.visible() else ""}
+        if driver_command == Command.IS_ELEMENT_SELECTED:
+            return {"value": self._nodo(params).checked}
+        if driver_command == Command.IS_ELEMENT_ENABLED:
+            return {"value": "disabled" not in self._nodo(params).attrs}
+        if driver_command == Command.CLICK_ELEMENT:
+            self._click(self._nodo(params))
+            return {"value": None}
+        if driver_command == Command.CLEAR_ELEMENT:
+            self._nodo(params).value = ""
+            return {"value": None}
+        if driver_command == Command.SEND_KEYS_TO_ELEMENT:
+            self._nodo(params).value += params.get("text", "")
+            return {"value": None}
+        if driver_command in (Command.W3C_ACTIONS, Command.W3C_CLEAR_ACTIONS):
+            return {"value": None}
+        raise WebDriverException(f"Comando no soportado por el fake: {driver_command}")
@@ -0,0 +1,115 @@
+"""
+Modo incremental: qué filas se saltean, cuáles vencen y cómo se leen las
+marcas de urgencia de la hoja.
+"""
+import json
+
+import pytest
+
+import utils_mini
+from masivos import normalizar_expediente, separar_urgencia
+from utils_mini import (
+    borrar_marca,
+    contar_editados,
+    filtrar_filas_nuevas,
+    hash_celda,
+    leer_marca,
+    registrar_filas_procesadas,
+)
+
+AHORA = 1_700_000_000.0
+HORA = 3600.0
+
+
+def _marca(expedientes, filas=None):
+    return {"ultima_fila": 0, "expedientes": expedientes, "filas": filas or {}}
+
+
+@pytest.fixture
+def marcas_tmp(tmp_path, monkeypatch):
+    path = tmp_path / "marcas.json"
+    monkeypatch.setattr(utils_mini, "MARCAS_PATH", path)
+    return path
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    ("123/2020", ("123/2020", False)),
+    ("  123/2020  ", ("123/2020", False)),
+    ("!123/2020", ("123/2020", True)),
+    ("! 123/2020", ("123/2020", True)),
+    ("123/2020 (URGENTE)", ("123/2020", True)),
+    ("123/2020 urgente", ("123/2020", True)),
+    ("!123/2020 (Urgente)", ("123/2020", True)),
+    ("", ("", False)),
+    (None, ("", False)),
+])
+def test_separar_urgencia(valor, esperado):
+    assert separar_urgencia(valor) == esperado
+
+
+def test_filtrar_omite_despachados_aunque_cambie_la_fila_o_la_urgencia():
+    marca = _marca({"1232020": {"fila": 3, "ts": AHORA - HORA}})
+    filas = [(7, "!123/2020"), (8, "456/2021")]
+
+    nuevos = filtrar_filas_nuevas(filas, marca, normalizar_expediente, ahora=AHORA, ventana_h=72)
+
+    assert nuevos == [(8, "456/2021")]
+
+
+def test_filtrar_vuelve_a_tomar_los_vencidos():
+    marca = _marca({
+        "1232020": {"fila": 3, "ts": AHORA - 73 * HORA},
+        "4562021": {"fila": 4, "ts": AHORA - 71 * HORA},
+    })
+    filas = [(3, "123/2020"), (4, "456/2021")]
+
+    assert filtrar_filas_nuevas(filas, marca, normalizar_expediente,
+                                ahora=AHORA, ventana_h=72) == [(3, "123/2020")]
+    # Ventana 0 = no vence nunca
+    assert filtrar_filas_nuevas(filas, marca, normalizar_expediente,
+                                ahora=AHORA, ventana_h=0) == []
+
+
+def test_contar_editados_solo_cuenta_cambios_en_el_lugar():
+    marca = _marca({}, filas={"3": hash_celda("1232020"), "4": hash_celda("4562021")})
+    filas = [(3, "123/2020 (URGENTE)"), (4, "789/2022"), (5, "111/2023")]
+
+    # Fila 3: misma causa, solo cambió la urgencia. Fila 5: nunca registrada.
+    assert contar_editados(filas, marca, normalizar_expediente) == 1
+
+
+def test_registrar_guarda_fecha_y_descarta_vencidos(marcas_tmp, monkeypatch):
+    clave = "Hoja|masivos|E"
+    marcas_tmp.write_text(json.dumps({clave: {
+        "ultima_fila": 3,
+        "expedientes": {"viejo": {"fila": 3, "ts": AHORA - 100 * HORA}},
+        "filas": {},
+    }}), encoding="utf-8")
+    monkeypatch.setattr(utils_mini.time, "time", lambda: AHORA)
+
+    registrar_filas_procesadas(clave, {5: "1232020"})
+
+    marca = leer_marca(clave)
+    assert marca["expedientes"] == {"1232020": {"fila": 5, "ts": AHORA}}
+    assert marca["ultima_fila"] == 5
+
+
+def test_leer_marca_formato_viejo_queda_vencido(marcas_tmp):
+    clave = "Hoja|masivos|A"
+    marcas_tmp.write_text(json.dumps({clave: {"expedientes": {"1232020": 3}}}), encoding="utf-8")
+
+    marca = leer_marca(clave)
+
+    assert marca["expedientes"] == {"1232020": {"fila": 3, "ts": 0.0}}
+    assert filtrar_filas_nuevas([(3, "123/2020")], marca, normalizar_expediente,
+                                ahora=AHORA, ventana_h=72) == [(3, "123/2020")]
+
+
+def test_borrar_marca(marcas_tmp):
+    registrar_filas_procesadas("Hoja|masivos|A", {3: "1232020"})
+    registrar_filas_procesadas("Hoja|masivos|C", {3: "4562021"})
+
+    assert borrar_marca("Hoja|masivos|A") is True
+    assert borrar_marca("Hoja|masivos|A") is False
+    assert leer_marca("Hoja|masivos|A")["expedientes"] == {}
+    assert "4562021" in leer_marca("Hoja|masivos|C")["expedientes"]
@@ -0,0 +1,94 @@
+"""
+Presupuesto de comandos WebDriver por función, contra el driver falso.
+Un .text o is_displayed() de más dentro de un loop rompe estos tests.
+"""
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from fake_driver import FakeDriver
+from masivos import seleccionar_mejor_opcion
+from utils_mini import (
+    comandos_driver,
+    instrumentar_driver,
+    masivo_marcar_a_la_firma,
+    paso_webdriver,
+    seleccionar_modelo_por_texto,
+)
+
+XPATH_FILAS = "//tr[contains(@class, 'rich-table-row')]"
+MODELO = "PASE A RESOLVER PEDIDO DE EMBARGO -ETQ-"
+
+
+def _filas(driver):
+    filas = driver.find_elements(By.XPATH, XPATH_FILAS)
+    driver.comandos.clear()
+    return filas
+
+
+def test_seleccionar_mejor_opcion_presupuesto():
+    driver = FakeDriver.desde_fixture("grilla_expedientes.html")
+    filas = _filas(driver)
+
+    assert seleccionar_mejor_opcion(filas) is True
+
+    tildados = [n.attrs["name"] for n in driver._por_id.values() if n.tag == "input" and n.checked]
+    assert tildados == ["grilla:3:sel"]
+    # Por fila: un findChildElement (td[4]) y un getElementText; más el checkbox elegido.
+    assert driver.comandos["getElementText"] == len(filas)
+    assert driver.comandos["findChildElement"] == len(filas) + 1
+    assert driver.comandos["isElementSelected"] == 1
+    assert driver.comandos["elementClick"] == 1
+    assert sum(driver.comandos.values()) <= 2 * len(filas) + 3
+
+
+def test_seleccionar_modelo_por_texto_presupuesto():
+    driver = FakeDriver.desde_fixture("sugerencias_modelo.html")
+    wait = WebDriverWait(driver, 0.5)
+
+    assert seleccionar_modelo_por_texto(driver, wait, "EMBARGO", MODELO, MODELO) is True
+
+    assert driver.ultimo_script_objetivo.texto() == MODELO
+    # La opción buscada es la 4ª fila: is_displayed + .text por fila recorrida
+    # (+1 is_displayed de element_to_be_clickable sobre el input).
+    filas_recorridas = 4
+    assert driver.comandos["getElementText"] == filas_recorridas
+    assert driver.comandos["isElementDisplayed"] == filas_recorridas + 1
+    assert driver.comandos["findChildElements"] == 1
+    assert sum(driver.comandos.values()) <= 18
+
+
+def test_masivo_marcar_a_la_firma_presupuesto():
+    driver = FakeDriver.desde_fixture("firma.html")
+    wait = WebDriverWait(driver, 0.5)
+
+    assert masivo_marcar_a_la_firma(driver, wait, marcar=True) is True
+
+    assert driver.comandos["findElement"] == 1
+    assert driver.comandos["elementClick"] == 1
+    # Estado previo + una sola vuelta del polling.
+    assert driver.comandos["isElementSelected"] == 2
+    assert sum(driver.comandos.values()) <= 5
+
+
+def test_masivo_marcar_a_la_firma_ya_marcado_no_clickea():
+    driver = FakeDriver.desde_fixture("firma.html")
+    wait = WebDriverWait(driver, 0.5)
+    masivo_marcar_a_la_firma(driver, wait, marcar=True)
+    driver.comandos.clear()
+
+    assert masivo_marcar_a_la_firma(driver, wait, marcar=True) is True
+    assert driver.comandos["elementClick"] == 0
+    assert sum(driver.comandos.values()) <= 2
+
+
+def test_instrumentar_driver_cuenta_lo_mismo_que_el_fake():
+    driver = FakeDriver.desde_fixture("grilla_expedientes.html")
+    instrumentar_driver(driver)
+    filas = _filas(driver)
+    antes = comandos_driver(driver)
+
+    with paso_webdriver(driver, "expediente"):
+        seleccionar_mejor_opcion(filas)
+
+    assert comandos_driver(driver) - antes == sum(driver.comandos.values())
+    assert driver._lex_stats["pasos"]["expediente"]["por_tipo"]["getElementText"] == len(filas)
@@ -0,0 +1,45 @@
+"""
+Conteo de documentos en la consulta de verificación: coincidencia exacta de
+modelo, solo documentos de esta corrida y páginas que no son la consulta.
+"""
+from datetime import datetime
+
+from masivos import contar_en_consulta
+
+EXP = "1232020"
+IMPUGNA = "TRASLADO DE LAS IMPUGNACIONES"
+IMPUGNA_PREVIO = "TRASLADO DE LAS IMPUGNACIONES + PREVIO"
+DESDE = datetime(2024, 5, 10, 9, 0).timestamp()
+TEXTO = "Expediente 123/2020 - PEREZ c/ GOMEZ s/ EJECUCION"
+
+
+def test_modelo_exacto_no_cuenta_el_que_lo_contiene():
+    filas = [["Fecha", "Modelo"],
+             ["10/05/2024", IMPUGNA_PREVIO]]
+
+    assert contar_en_consulta(filas, TEXTO, EXP, IMPUGNA, DESDE) == 0
+    assert contar_en_consulta(filas, TEXTO, EXP, IMPUGNA_PREVIO, DESDE) == 1
+
+
+def test_solo_cuenta_documentos_desde_el_arranque():
+    filas = [["08/05/2024", IMPUGNA],              # de otro día
+             ["10/05/2024 08:30", IMPUGNA],        # hoy, antes de arrancar
+             ["10/05/2024 09:15", IMPUGNA],
+             ["10/05/2024", "  traslado de las   impugnaciones "]]  # sin hora: cuenta por día
+
+    assert contar_en_consulta(filas, TEXTO, EXP, IMPUGNA, DESDE) == 2
+
+
+def test_pagina_sin_el_expediente_no_es_faltante():
+    login = "Ingrese usuario y contraseña"
+
+    assert contar_en_consulta([], login, EXP, IMPUGNA, DESDE) is None
+    # Otro expediente que lo contiene como substring tampoco cuenta
+    assert contar_en_consulta([], "Expediente 1123/2020", EXP, IMPUGNA, DESDE) is None
+    assert contar_en_consulta([], TEXTO, EXP, IMPUGNA, DESDE) == 0
+
+
+def test_fila_del_modelo_sin_fecha_queda_sin_verificar():
+    filas = [["sin fecha", IMPUGNA]]
+
+    assert contar_en_consulta(filas, TEXTO, EXP, IMPUGNA, DESDE) is None
@@ -3,7 +3,13 @@
 
 import time
 import os
+import json
+import random
+import hashlib
+import shutil
+import tempfile
 import gspread
+from contextlib import contextmanager
 from pathlib import Path
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -21,6 +27,10 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 load_dotenv(PROJECT_ROOT / ".env")
 
 LEX100_URL = os.getenv("LEX100_URL")
+# URL directa a "Documentos digitales" (opcional; sin conversation id de JSF)
+LEX100_DOCUMENTOS_URL = os.getenv("LEX100_DOCUMENTOS_URL")
+# "eager": no espera imágenes/estilos para devolver control tras driver.get()
+PAGE_LOAD_STRATEGY = os.getenv("PAGE_LOAD_STRATEGY", "eager")
 CUIT = os.getenv("CUIT")
 PASSWORD = os.getenv("PASSWORD")
 
@@ -29,6 +39,468 @@ DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 CREDENCIALES_PATH = PROJECT_ROOT / "service_account.json"
 
+# === PERFILES DE CHROME (template con caché precalentada) ===
+# El template guarda solo la caché de estáticos de Lex100 (RichFaces JS/CSS);
+# cada worker arranca con una copia en tmpfs (/dev/shm) si está disponible.
+USAR_TEMPLATE_CHROME = os.getenv("USAR_TEMPLATE_CHROME", "1") != "0"
+CHROME_TEMPLATE_DIR = Path(os.getenv("CHROME_TEMPLATE_DIR", PROJECT_ROOT / "chrome_template"))
+CHROME_TEMPLATE_MAX_AGE_H = float(os.getenv("CHROME_TEMPLATE_MAX_AGE_H", 24))
+CHROME_PERFILES_DIR = Path(os.getenv(
+    "CHROME_PERFILES_DIR",
+    "/dev/shm/lex1000_perfiles" if os.path.isdir("/dev/shm")
+    else str(Path(tempfile.gettempdir()) / "lex1000_perfiles"),
+))
+CHROME_PERFILES_MAX_AGE_H = float(os.getenv("CHROME_PERFILES_MAX_AGE_H", 12))
+_TEMPLATE_MARCA = ".lex1000_template_ok"
+_CACHE_SUBDIRS = ("Default/Cache", "Default/Code Cache", "Default/GPUCache", "GrShaderCache", "ShaderCache")
+
+# === LIMITADOR DE GOOGLE SHEETS (compartido entre procesos) ===
+# Token bucket guardado en un archivo de estado y protegido por un lock file,
+# así todos los Process de masivos.py comparten la misma cuota por minuto.
+SHEETS_RPM = float(os.getenv("SHEETS_RPM", 50))  # <= 0 = sin límite
+SHEETS_BURST = float(os.getenv("SHEETS_BURST", 10))
+SHEETS_MAX_REINTENTOS = int(os.getenv("SHEETS_MAX_REINTENTOS", 6))
+SHEETS_BACKOFF_BASE = float(os.getenv("SHEETS_BACKOFF_BASE", 1.0))
+SHEETS_BACKOFF_MAX = float(os.getenv("SHEETS_BACKOFF_MAX", 60.0))
+SHEETS_RATE_DIR = Path(os.getenv("SHEETS_RATE_DIR", tempfile.gettempdir()))
+SHEETS_ESTADO_PATH = SHEETS_RATE_DIR / "lex1000_sheets_bucket.json"
+SHEETS_LOCK_PATH = SHEETS_RATE_DIR / "lex1000_sheets_bucket.lock"
+
+# Marcas de agua del modo incremental (hoja/pestaña/columna → filas procesadas)
+MARCAS_PATH = Path(os.getenv("MARCAS_PATH", PROJECT_ROOT / "masivos_marcas.json"))
+# Horas que un expediente despachado cuenta como "ya hecho" (0 = no vence nunca)
+INCREMENTAL_VENTANA_H = float(os.getenv("INCREMENTAL_VENTANA_H", 72))
+# Latencia medida por opción (seg/expediente + overhead), para el planificador
+LATENCIAS_PATH = Path(os.getenv("LATENCIAS_PATH", PROJECT_ROOT / "masivos_latencias.json"))
+
+# Contadores del proceso actual (ver estadisticas_sheets)
+SHEETS_STATS = {
+    "llamadas": 0,
+    "reintentos": 0,
+    "espera_throttle_s": 0.0,
+    "espera_backoff_s": 0.0,
+}
+
+# ============== LIMITADOR DE SHEETS ==============
+
+@contextmanager
+def _lock_archivo(path: Path, stale: float = 10.0):
+    """
+    Lock entre procesos con O_EXCL. Si el lock quedó huérfano (proceso muerto)
+    se libera pasado 'stale' segundos.
+    """
+    while True:
+        try:
+            fd = os.open(str(path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.close(fd)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > stale:
+                    os.remove(path)
+                    continue
+            except OSError:
+                pass
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _leer_bucket_sheets() -> dict:
+    try:
+        with open(SHEETS_ESTADO_PATH, "r", encoding="utf-8") as f:
+            estado = json.load(f)
+        return {"tokens": float(estado["tokens"]), "ts": float(estado["ts"])}
+    except Exception:
+        return {"tokens": SHEETS_BURST, "ts": time.time()}
+
+def _guardar_bucket_sheets(tokens: float, ts: float):
+    tmp = SHEETS_ESTADO_PATH.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"tokens": tokens, "ts": ts}, f)
+    os.replace(tmp, SHEETS_ESTADO_PATH)
+
+def _tomar_token_sheets() -> float:
+    """
+    Consume un token del bucket compartido. Devuelve los segundos esperados.
+    Con SHEETS_RPM <= 0 no limita.
+    """
+    if SHEETS_RPM <= 0:
+        return 0.0
+    tasa = SHEETS_RPM / 60.0
+    esperado = 0.0
+    while True:
+        with _lock_archivo(SHEETS_LOCK_PATH):
+            estado = _leer_bucket_sheets()
+            ahora = time.time()
+            tokens = min(SHEETS_BURST, estado["tokens"] + max(0.0, ahora - estado["ts"]) * tasa)
+            if tokens >= 1:
+                _guardar_bucket_sheets(tokens - 1, ahora)
+                return esperado
+            _guardar_bucket_sheets(tokens, ahora)
+            falta = (1 - tokens) / tasa
+        time.sleep(falta)
+        esperado += falta
+
+def _vaciar_bucket_sheets():
+    """Ante un 429 vacía el bucket para que todos los procesos frenen."""
+    if SHEETS_RPM <= 0:
+        return
+    try:
+        with _lock_archivo(SHEETS_LOCK_PATH):
+            _guardar_bucket_sheets(0.0, time.time())
+    except Exception:
+        pass
+
+def _status_http(e: Exception):
+    """Extrae el status HTTP de un error de gspread/requests (o None)."""
+    resp = getattr(e, "response", None)
+    status = getattr(resp, "status_code", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def llamar_sheets(fn, *args, **kwargs):
+    """
+    Ejecuta una llamada a la API de Sheets pasando por el limitador compartido.
+    Reintenta 429/5xx con backoff exponencial con jitter.
+    """
+    intento = 0
+    while True:
+        SHEETS_STATS["espera_throttle_s"] += _tomar_token_sheets()
+        SHEETS_STATS["llamadas"] += 1
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            status = _status_http(e)
+            reintentable = status is not None and (status == 429 or 500 <= status < 600)
+            if not reintentable or intento >= SHEETS_MAX_REINTENTOS:
+                raise
+            if status == 429:
+                _vaciar_bucket_sheets()
+            espera = random.uniform(0, min(SHEETS_BACKOFF_MAX, SHEETS_BACKOFF_BASE * (2 ** intento)))
+            intento += 1
+            SHEETS_STATS["reintentos"] += 1
+            SHEETS_STATS["espera_backoff_s"] += espera
+            print(f"⏳ Sheets respondió {status}. Reintento {intento}/{SHEETS_MAX_REINTENTOS} en {espera:.1f}s...")
+            time.sleep(espera)
+
+def estadisticas_sheets() -> dict:
+    """Copia de los contadores del limitador para este proceso."""
+    return dict(SHEETS_STATS)
+
+# ============== MARCAS DE AGUA (modo incremental) ==============
+
+def _guardar_json_atomico(path: Path, data):
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+def hash_celda(valor: str) -> str:
+    """Hash corto del contenido normalizado de una celda."""
+    return hashlib.sha1((valor or "").strip().encode("utf-8")).hexdigest()[:16]
+
+def clave_marca(sheet_name: str, pestaña: str, col_letra: str) -> str:
+    return f"{sheet_name}|{pestaña}|{col_letra.upper()}"
+
+def _leer_marcas() -> dict:
+    try:
+        with open(MARCAS_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"⚠️ No pude leer {MARCAS_PATH} ({e}). Se procesa como primera vez.")
+        return {}
+
+def leer_marca(clave: str) -> dict:
+    """
+    Devuelve para la clave (hoja|pestaña|columna):
+      "expedientes": {expediente normalizado: {"fila", "ts"}}  → despachados (ts = epoch)
+      "filas": {"<fila>": hash del expediente}                  → solo para detectar ediciones
+      "ultima_fila": int                                        → informativo (no filtra)
+    """
+    marca = _leer_marcas().get(clave) or {}
+    expedientes = {}
+    for exp, entrada in (marca.get("expedientes") or {}).items():
+        # Formato viejo {exp: fila}: sin fecha, se toma como vencido
+        if not isinstance(entrada, dict):
+            entrada = {"fila": int(entrada), "ts": 0.0}
+        expedientes[exp] = entrada
+    return {
+        "ultima_fila": int(marca.get("ultima_fila", 0)),
+        "expedientes": expedientes,
+        "filas": dict(marca.get("filas", {})),
+    }
+
+def _vigente(entrada: dict, ahora: float, ventana_h: float) -> bool:
+    if ventana_h <= 0:
+        return True
+    return ahora - float(entrada.get("ts", 0)) < ventana_h * 3600
+
+def borrar_marca(clave: str) -> bool:
+    """Borra la marca de hoja|pestaña|columna (--reset-incremental). True si existía."""
+    if not MARCAS_PATH.exists():
+        return False
+    lock = MARCAS_PATH.with_suffix(".lock")
+    with _lock_archivo(lock):
+        marcas = _leer_marcas()
+        if clave not in marcas:
+            return False
+        del marcas[clave]
+        _guardar_json_atomico(MARCAS_PATH, marcas)
+    return True
+
+def registrar_filas_procesadas(clave: str, filas: dict):
+    """
+    Suma al store los expedientes procesados OK ({fila: expediente normalizado})
+    con la hora actual, y descarta los que ya vencieron. Seguro entre procesos.
+    """
+    if not filas:
+        return
+    MARCAS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    lock = MARCAS_PATH.with_suffix(".lock")
+    ahora = time.time()
+    with _lock_archivo(lock):
+        marcas = _leer_marcas()
+        marca = marcas.setdefault(clave, {})
+        expedientes = {exp: e for exp, e in marca.get("expedientes", {}).items()
+                       if isinstance(e, dict) and _vigente(e, ahora, INCREMENTAL_VENTANA_H)}
+        marca["expedientes"] = expedientes
+        hashes = marca.setdefault("filas", {})
+        for fila, exp_norm in filas.items():
+            expedientes[exp_norm] = {"fila": int(fila), "ts": ahora}
+            hashes[str(fila)] = hash_celda(exp_norm)
+        marca["ultima_fila"] = max([int(marca.get("ultima_fila", 0))] + [int(f) for f in filas])
+        _guardar_json_atomico(MARCAS_PATH, marcas)
+
+def filtrar_filas_nuevas(filas, marca: dict, normalizar, ahora: float = None,
+                         ventana_h: float = None):
+    """
+    De [(fila, valor), ...] deja las que tienen un expediente todavía no
+    despachado en esta hoja/pestaña/columna dentro de la ventana
+    (INCREMENTAL_VENTANA_H). La clave es el expediente normalizado, así
+    insertar/borrar filas o cambiar la marca de urgencia no vuelve a
+    despachar nada; pasada la ventana, el expediente cuenta como nuevo.
+    """
+    ahora = time.time() if ahora is None else ahora
+    ventana_h = INCREMENTAL_VENTANA_H if ventana_h is None else ventana_h
+    hechos = {exp for exp, e in marca.get("expedientes", {}).items()
+              if _vigente(e, ahora, ventana_h)}
+    return [(f, v) for f, v in filas if normalizar(v) not in hechos]
+
+def contar_editados(filas, marca: dict, normalizar) -> int:
+    """Filas cuyo contenido cambió en el lugar respecto de lo registrado para esa fila."""
+    hashes = marca.get("filas", {})
+    return sum(1 for f, v in filas
+               if str(f) in hashes and hashes[str(f)] != hash_celda(normalizar(v)))
+
+# ============== LATENCIAS MEDIDAS (planificador) ==============
+
+def leer_latencias() -> dict:
+    """{opcion_id: {"seg_por_exp": float, "overhead_s": float}} de corridas anteriores."""
+    try:
+        with open(LATENCIAS_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def registrar_latencia(opcion_id: str, seg_por_exp: float, overhead_s: float, alfa: float = 0.3):
+    """Actualiza la latencia de la opción con media móvil exponencial."""
+    LATENCIAS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with _lock_archivo(LATENCIAS_PATH.with_suffix(".lock")):
+        datos = leer_latencias()
+        prev = datos.get(opcion_id)
+        if prev:
+            seg_por_exp = alfa * seg_por_exp + (1 - alfa) * float(prev.get("seg_por_exp", seg_por_exp))
+            overhead_s = alfa * overhead_s + (1 - alfa) * float(prev.get("overhead_s", overhead_s))
+        datos[opcion_id] = {"seg_por_exp": round(seg_por_exp, 3), "overhead_s": round(overhead_s, 3)}
+        _guardar_json_atomico(LATENCIAS_PATH, datos)
+
+# ============== PERFILES DE CHROME ==============
+
+def template_chrome_vigente() -> bool:
+    marca = CHROME_TEMPLATE_DIR / _TEMPLATE_MARCA
+    try:
+        return time.time() - marca.stat().st_mtime < CHROME_TEMPLATE_MAX_AGE_H * 3600
+    except OSError:
+        return False
+
+def _perfil_en_uso(d: Path) -> bool:
+    """
+    ¿Hay un Chrome abierto sobre este perfil? (p.ej. uno que quedó abierto
+    con keep_browser_open). Linux/mac: SingletonLock → "host-pid";
+    Windows: 'lockfile' queda bloqueado mientras Chrome corre.
+    """
+    lockfile = d / "lockfile"
+    if lockfile.exists():
+        try:
+            os.remove(lockfile)
+        except OSError:
+            return True
+    singleton = d / "SingletonLock"
+    if os.path.lexists(singleton):
+        try:
+            pid = int(os.readlink(singleton).rsplit("-", 1)[-1])
+            os.kill(pid, 0)
+            return True
+        except ProcessLookupError:
+            return False
+        except (OSError, ValueError):
+            return True
+    return False
+
+def limpiar_perfiles_chrome(max_age_h: float = CHROME_PERFILES_MAX_AGE_H):
+    """Borra copias de perfil de workers viejas que no estén en uso."""
+    if not CHROME_PERFILES_DIR.is_dir():
+        return
+    limite = time.time() - max_age_h * 3600
+    for d in CHROME_PERFILES_DIR.iterdir():
+        try:
+            if d.is_dir() and d.stat().st_mtime < limite and not _perfil_en_uso(d):
+                shutil.rmtree(d, ignore_errors=True)
+        except OSError:
+            continue
+
+def liberar_perfil_chrome(driver):
+    """Borra la copia de perfil del driver (llamar después de driver.quit())."""
+    perfil = getattr(driver, "_lex_perfil_dir", None)
+    if perfil is not None:
+        shutil.rmtree(perfil, ignore_errors=True)
+
+def preparar_template_chrome(chrome_driver_path: str = None, forzar=False) -> bool:
+    """
+    Deja el template con la caché caliente: abre Chrome sobre el template,
+    hace login y navega a Documentos digitales. Solo si venció o no existe.
+    """
+    if not USAR_TEMPLATE_CHROME:
+        return False
+    limpiar_perfiles_chrome()
+    if template_chrome_vigente() and not forzar:
+        return True
+
+    CHROME_TEMPLATE_DIR.parent.mkdir(parents=True, exist_ok=True)
+    with _lock_archivo(CHROME_TEMPLATE_DIR.with_suffix(".lock"), stale=600):
+        if template_chrome_vigente() and not forzar:
+            return True
+        print("🔥 Precalentando template de Chrome (caché de Lex100)...")
+        shutil.rmtree(CHROME_TEMPLATE_DIR, ignore_errors=True)
+        driver = None
+        try:
+            driver, wait, _ = configurar_selenium(chrome_driver_path, user_data_dir=CHROME_TEMPLATE_DIR)
+            iniciar_sesion(driver, wait)
+            abrir_menu_masivos_documentos_digitales(driver, wait, verificar_input=True)
+        except Exception as e:
+            print(f"⚠️ No pude precalentar el template ({type(e).__name__} - {e}). Sigo con perfiles nuevos.")
+            return False
+        finally:
+            if driver is not None:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+        (CHROME_TEMPLATE_DIR / _TEMPLATE_MARCA).touch()
+        print("✅ Template de Chrome listo.")
+        return True
+
+def clonar_perfil_chrome(slot) -> Path:
+    """
+    Copia la caché del template al perfil del worker 'slot' (slot-{slot}).
+    El directorio se reutiliza entre corridas; si hay un Chrome abierto sobre
+    él se usa slot-{slot}-1, -2, ... Devuelve None si no hay template vigente.
+    """
+    if not USAR_TEMPLATE_CHROME or not template_chrome_vigente():
+        return None
+    CHROME_PERFILES_DIR.mkdir(parents=True, exist_ok=True)
+    destino = CHROME_PERFILES_DIR / f"slot-{slot}"
+    n = 0
+    while destino.exists() and _perfil_en_uso(destino):
+        n += 1
+        destino = CHROME_PERFILES_DIR / f"slot-{slot}-{n}"
+    shutil.rmtree(destino, ignore_errors=True)
+    destino.mkdir(parents=True, exist_ok=True)
+    for sub in _CACHE_SUBDIRS:
+        origen = CHROME_TEMPLATE_DIR / sub
+        if origen.is_dir():
+            try:
+                shutil.copytree(origen, destino / sub, dirs_exist_ok=True)
+            except (OSError, shutil.Error):
+                continue
+    return destino
+
+# ============== INSTRUMENTACIÓN WEBDRIVER ==============
+
+def instrumentar_driver(driver):
+    """
+    Cuenta los comandos WebDriver (por tipo y por paso lógico) envolviendo
+    driver.execute, por donde pasan también WebElement y ActionChains.
+    """
+    if getattr(driver, "_lex_stats", None) is not None:
+        return driver._lex_stats
+    stats = {"paso": "general", "pasos": {}}
+    original = driver.execute
+
+    def execute(driver_command, params=None):
+        t0 = time.perf_counter()
+        try:
+            return original(driver_command, params)
+        finally:
+            dt = time.perf_counter() - t0
+            p = stats["pasos"].setdefault(stats["paso"], {"comandos": 0, "segundos_comandos": 0.0,
+                                                          "segundos_paso": 0.0, "veces": 0, "por_tipo": {}})
+            p["comandos"] += 1
+            p["segundos_comandos"] += dt
+            p["por_tipo"][driver_command] = p["por_tipo"].get(driver_command, 0) + 1
+
+    driver.execute = execute
+    driver._lex_stats = stats
+    return stats
+
+@contextmanager
+def paso_webdriver(driver, nombre: str):
+    """Atribuye los comandos del bloque al paso 'nombre'. No-op si no está instrumentado."""
+    stats = getattr(driver, "_lex_stats", None)
+    if stats is None:
+        yield
+        return
+    anterior = stats["paso"]
+    stats["paso"] = nombre
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        p = stats["pasos"].setdefault(nombre, {"comandos": 0, "segundos_comandos": 0.0,
+                                               "segundos_paso": 0.0, "veces": 0, "por_tipo": {}})
+        p["segundos_paso"] += time.perf_counter() - t0
+        p["veces"] += 1
+        stats["paso"] = anterior
+
+def comandos_driver(driver) -> int:
+    """Total de comandos enviados (0 si el driver no está instrumentado)."""
+    stats = getattr(driver, "_lex_stats", None)
+    if stats is None:
+        return 0
+    return sum(p["comandos"] for p in stats["pasos"].values())
+
+def resumen_comandos(driver) -> str:
+    """Tabla corta: comandos y tiempo por paso, con los tipos más frecuentes."""
+    stats = getattr(driver, "_lex_stats", None)
+    if stats is None:
+        return ""
+    lineas = []
+    for nombre, p in sorted(stats["pasos"].items(), key=lambda kv: -kv[1]["comandos"]):
+        veces = max(1, p["veces"])
+        top = ", ".join(f"{k}={v}" for k, v in sorted(p["por_tipo"].items(), key=lambda kv: -kv[1])[:4])
+        lineas.append(f"{nombre:<16} {p['comandos']:>5} cmd ({p['comandos'] / veces:.1f}/vez) "
+                      f"{p['segundos_comandos']:.1f}s en driver / {p['segundos_paso']:.1f}s total  [{top}]")
+    return "\n".join(lineas)
+
 # ============== FUNCIONES ESENCIALES ==============
 
 def autenticar_google_sheets(sheet_name, pestaña):
@@ -46,13 +518,20 @@ def autenticar_google_sheets(sheet_name, pestaña):
     ]
     creds = ServiceAccountCredentials.from_json_keyfile_name(str(CREDENCIALES_PATH), scope)
     cliente = gspread.authorize(creds)
-    return cliente.open(sheet_name).worksheet(pestaña)
+    libro = llamar_sheets(cliente.open, sheet_name)
+    return llamar_sheets(libro.worksheet, pestaña)
 
-def configurar_selenium(chrome_driver_path: str = None):
+def configurar_selenium(chrome_driver_path: str = None, perfil_slot=None, user_data_dir=None):
     """
-    Configura Selenium con Chrome
+    Configura Selenium con Chrome.
+    Con perfil_slot usa una copia del template de caché (ver clonar_perfil_chrome).
     """
     options = webdriver.ChromeOptions()
+    perfil_clonado = None
+    if user_data_dir is None and perfil_slot is not None:
+        user_data_dir = perfil_clonado = clonar_perfil_chrome(perfil_slot)
+    if user_data_dir is not None:
+        options.add_argument(f"--user-data-dir={user_data_dir}")
     
     prefs = {
         "download.default_directory": str(DOWNLOAD_DIR),
@@ -64,6 +543,8 @@ def configurar_selenium(chrome_driver_path: str = None):
     options.add_experimental_option("detach", True)
     options.add_argument("--start-maximized")
     options.add_argument("--log-level=3")
+    if PAGE_LOAD_STRATEGY:
+        options.page_load_strategy = PAGE_LOAD_STRATEGY
 
     try:
         if chrome_driver_path:
@@ -74,7 +555,10 @@ def configurar_selenium(chrome_driver_path: str = None):
         print("🧭 Abriendo Google Chrome...")
         driver = webdriver.Chrome(service=service, options=options)
     except Exception as e:
+        if perfil_clonado is not None:
+            shutil.rmtree(perfil_clonado, ignore_errors=True)
         raise RuntimeError(f"No pude iniciar Chrome: {e}")
+    driver._lex_perfil_dir = perfil_clonado
 
     wait = WebDriverWait(driver, 10)
     actions = ActionChains(driver)
@@ -110,10 +594,80 @@ def iniciar_sesion(driver, wait):
     except TimeoutException:
         print("⚠️ No se detectó el menú 'Expedientes'. Verificar si se cargó bien el sistema.")
 
-def abrir_menu_masivos_documentos_digitales(driver, wait, verificar_input=True):
+NAME_CODIGOBARRAS = 'despachoDocumentosMasivoDecorate:searchFilters:search1:filterFormVisible:codigoBarras'
+DOCUMENTOS_XPATH = '//*[@id="masivoDespachoExpedientes"]/div/div/table/tbody/tr/td[2]/span/h2/a'
+
+def _esperar_codigobarras(driver, timeout):
+    try:
+        return WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.NAME, NAME_CODIGOBARRAS))
+        )
+    except TimeoutException:
+        return None
+
+def _volver_al_inicio(driver, timeout=10):
+    """Vuelve a la home post-login (la sesión sigue en las cookies)."""
+    try:
+        driver.get(LEX100_URL)
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.XPATH, '//div[text()="Expedientes"]'))
+        )
+    except Exception:
+        pass
+
+def _abrir_documentos_rapido(driver, timeout=5):
+    """
+    Atajo sin hover: URL directa (LEX100_DOCUMENTOS_URL) o click JS sobre los
+    items del menú RichFaces, que ya están en el DOM aunque ocultos.
+    Devuelve el input de código de barras o None si no funcionó.
+    """
+    # a) URL directa; si no sirve, volver a la home antes de los fallbacks
+    if LEX100_DOCUMENTOS_URL:
+        try:
+            driver.get(LEX100_DOCUMENTOS_URL)
+            el = _esperar_codigobarras(driver, timeout)
+            if el is not None:
+                return el
+        except Exception:
+            pass
+        _volver_al_inicio(driver)
+
+    # b) Acción JSF directa: click JS en 'Despacho de Documentos' y luego en el link
+    try:
+        ok = driver.execute_script("""
+            const cont = document.getElementById('toolbarForm:j_id244');
+            if (!cont) return false;
+            const items = cont.querySelectorAll('span.rich-menu-item-label');
+            for (const it of items) {
+                const t = (it.textContent || '').trim().toLowerCase().replace(/\\s+/g, ' ');
+                if (t.includes('despacho de documentos')) {
+                    (it.closest('.rich-menu-item') || it).click();
+                    return true;
+                }
+            }
+            return false;
+        """)
+        if not ok:
+            return None
+        link = WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.XPATH, DOCUMENTOS_XPATH))
+        )
+        driver.execute_script("arguments[0].click();", link)
+        return _esperar_codigobarras(driver, timeout)
+    except Exception:
+        return None
+
+def abrir_menu_masivos_documentos_digitales(driver, wait, verificar_input=True, rapido=True):
     """
     Navega a: Masivos -> Despacho de Documentos -> Documentos digitales
+    Primero intenta el atajo (URL / click JS); si falla, recorre el menú.
     """
+    if rapido:
+        el = _abrir_documentos_rapido(driver)
+        if el is not None:
+            return el if verificar_input else True
+        print("↩️ Atajo a 'Documentos digitales' no disponible. Navegando por el menú...")
+
     # 1) Click en 'Masivos'
     try:
         masivos_container = wait.until(EC.presence_of_element_located((By.ID, "toolbarForm:j_id244")))
@@ -148,14 +702,12 @@ def abrir_menu_masivos_documentos_digitales(driver, wait, verificar_input=True):
         raise TimeoutException("No pude clickear 'Despacho de Documentos'")
 
     # 3) Click en 'Documentos digitales'
-    documentos_xpath = '//*[@id="masivoDespachoExpedientes"]/div/div/table/tbody/tr/td[2]/span/h2/a'
-    driver.find_element(By.XPATH, documentos_xpath).click()
+    driver.find_element(By.XPATH, DOCUMENTOS_XPATH).click()
 
     if not verificar_input:
         return True
 
     # 4) Verificar input de código de barras
-    NAME_CODIGOBARRAS = 'despachoDocumentosMasivoDecorate:searchFilters:search1:filterFormVisible:codigoBarras'
     el = wait.until(EC.presence_of_element_located((By.NAME, NAME_CODIGOBARRAS)))
     return el
 